@@ -3,20 +3,50 @@ from __future__ import annotations
 
 import json
 import logging
-import os
 
+from homeassistant.components import persistent_notification
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-
-from .const import DOMAIN
+from homeassistant.core import HomeAssistant, callback
+
+from .catalog import (
+    catalog_snapshot,
+    catalog_version,
+    diff_catalogs,
+    format_migration_report,
+    lineup_version,
+    load_extra_catalogs,
+    load_json_data,
+    merge_catalogs,
+    migrate_options,
+    provider_data_path,
+)
+from .channel_index import STAGE_FUZZY, STAGE_SUBSTRING, build_channel_index, normalize_name
+from .const import (
+    CONF_CATALOG_SNAPSHOT,
+    CONF_CATALOG_VERSION,
+    CONF_EXTRA_PROVIDERS,
+    CONF_FAST_PATH,
+    DEFAULT_ALIAS_MIN_COUNT,
+    DEFAULT_ALTERNATIVES,
+    DOMAIN,
+)
 from .intent import async_setup_intents
+from .miss_log import MissLog, should_record
+from .profiles import build_profiles, profile_mask
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 
+def _entry_platforms(entry: ConfigEntry) -> list[Platform]:
+    """Return the platforms of an entry (the fast path agent is opt-in)."""
+    if entry.options.get(CONF_FAST_PATH):
+        return [*PLATFORMS, Platform.CONVERSATION]
+    return PLATFORMS
+
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the TV Channel Mapping component."""
     # Register services globally
@@ -32,9 +62,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # Load the provider data
     provider = entry.data.get("provider")
-    # Convert 'HU One' to 'hu_one'
-    filename = provider.lower().replace(" ", "_")
-    data_path = os.path.join(os.path.dirname(__file__), "data", f"{filename}.json")
+    data_path = provider_data_path(provider)
     
     _LOGGER.debug(f"Loading data from {data_path} for provider {provider}")
 
@@ -47,13 +75,47 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error(f"Invalid JSON in provider data file: {data_path}")
         return False
 
+    catalogs = [(provider, channels_data["channels"])]
+    versions = [(provider, catalog_version(channels_data))]
+
+    # Additional bundled or user-supplied catalogs, merged once in order of precedence
+    extras = await hass.async_add_executor_job(
+        load_extra_catalogs,
+        provider,
+        entry.options.get(CONF_EXTRA_PROVIDERS, []),
+        hass.config.path(DOMAIN),
+    )
+    for source, extra_data in extras:
+        catalogs.append((source, extra_data["channels"]))
+        versions.append((source, catalog_version(extra_data)))
+
+    base_channels, conflicts = merge_catalogs(catalogs)
+    if conflicts:
+        _LOGGER.info(f"{len(conflicts)} channel conflicts merging {', '.join(s for s, _ in catalogs)}")
+
+    miss_log = MissLog(hass, entry.entry_id)
+    await miss_log.async_load()
+
+    # Bring customizations and logged channel IDs in line with the catalogs before indexing
+    _async_migrate_catalog(hass, entry, lineup_version(versions), base_channels, miss_log)
+
+    index = build_channel_index(base_channels, entry.options)
+    platforms = _entry_platforms(entry)
+
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "provider": provider,
-        "base_channels": channels_data["channels"]
+        "sources": [source for source, _ in catalogs],
+        "conflicts": conflicts,
+        "base_channels": base_channels,
+        "index": index,
+        "profiles": build_profiles(index, entry.options),
+        "miss_log": miss_log,
+        # Options may change before the reload, so unload exactly what was set up
+        "platforms": platforms,
     }
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
@@ -66,6 +128,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             try:
                 llm.async_register_tool(hass, TvChannelTool(hass, entry))
                 llm.async_register_tool(hass, TvChannelListTool(hass, entry))
+                llm.async_register_tool(hass, TvChannelResolveTool(hass, entry))
             except Exception as e:
                  _LOGGER.debug(f"Automatic LLM tool registration failed (this is harmless): {e}")
         else:
@@ -78,17 +141,71 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+@callback
+def _async_migrate_catalog(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    new_version: int | str,
+    channels: list[dict],
+    miss_log: MissLog,
+) -> None:
+    """Remap the entry's customizations if the lineup's catalogs changed version."""
+    old_version = entry.data.get(CONF_CATALOG_VERSION)
+    old_snapshot = entry.data.get(CONF_CATALOG_SNAPSHOT)
+
+    if old_version == new_version and old_snapshot is not None:
+        return
+
+    new_data = dict(entry.data)
+    new_data[CONF_CATALOG_VERSION] = new_version
+    new_data[CONF_CATALOG_SNAPSHOT] = catalog_snapshot(channels)
+
+    if old_snapshot is None:
+        # Entries created before catalogs were versioned: nothing to diff against
+        _LOGGER.debug(f"Recording catalog version {new_version} for {entry.title}")
+        hass.config_entries.async_update_entry(entry, data=new_data)
+        return
+
+    diff = diff_catalogs(old_snapshot, channels)
+    if not diff.has_changes:
+        # New version, same channels: nothing to remap or report
+        _LOGGER.debug(f"Catalog version {new_version} of {entry.title} has no channel changes")
+        hass.config_entries.async_update_entry(entry, data=new_data)
+        return
+
+    new_options, report = migrate_options(dict(entry.options), diff)
+    miss_log.remap(diff.id_map)
+    hass.config_entries.async_update_entry(entry, data=new_data, options=new_options)
+
+    message = format_migration_report(old_version, new_version, diff, report)
+    _LOGGER.info(message)
+    if report["remapped"] or report["dropped"]:
+        persistent_notification.async_create(
+            hass,
+            message,
+            title="TV Channel Mapping",
+            notification_id=f"{DOMAIN}_{entry.entry_id}_catalog_migration",
+        )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+    platforms = hass.data[DOMAIN].get(entry.entry_id, {}).get("platforms", PLATFORMS)
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, platforms):
         # Only remove data if all entries are unloaded (though usually 1 entry per integration instance)
         # For simplicity in this structure we just pop.
         if entry.entry_id in hass.data[DOMAIN]:
-            hass.data[DOMAIN].pop(entry.entry_id)
+            data = hass.data[DOMAIN].pop(entry.entry_id)
+            await data["miss_log"].async_save()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored data of a removed config entry."""
+    await MissLog(hass, entry.entry_id).async_remove()
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -112,7 +229,13 @@ async def async_register_global_services(hass: HomeAssistant):
             raise ValueError("No TV Channel Mapping configuration found.")
         
         channel_name_input = call.data.get("channel_name")
-        await _async_tune_channel_logic(hass, entry, channel_name_input)
+        await _async_tune_channel_logic(
+            hass,
+            entry,
+            channel_name_input,
+            profile=call.data.get("profile"),
+            user_id=call.context.user_id,
+        )
 
     async def async_get_channel_list(call) -> dict:
         """Return a list of available channels."""
@@ -124,28 +247,98 @@ async def async_register_global_services(hass: HomeAssistant):
         if not data:
             raise ValueError("Integration not loaded")
 
-        # Re-use logic to get active map
-        options = entry.options
-        provider_channels_list = data.get("base_channels", [])
-        custom_channels_list = options.get("custom_channels", [])
-        deleted_channels = options.get("deleted_channels", [])
-        overrides = options.get("overrides", {})
-
-        all_channels_map = {ch["id"]: ch for ch in provider_channels_list}
-        for ch in custom_channels_list:
-            all_channels_map[ch["id"]] = ch
-
-        active_channels = []
-        for c_id, ch_data in all_channels_map.items():
-            if c_id not in deleted_channels:
-                name = overrides.get(c_id, ch_data["name"])
-                active_channels.append(name)
-        
-        active_channels.sort()
-        return {"channels": active_channels}
+        mask = profile_mask(hass, data["profiles"], call.data.get("profile"), call.context.user_id)
+        return {"channels": _visible_channel_names(data["index"], mask)}
+
+    async def async_get_miss_log(call) -> dict:
+        """Return how often names failed or only matched fuzzily."""
+        entry = get_target_entry(call)
+        if not entry:
+            raise ValueError("No TV Channel Mapping configuration found.")
+
+        data = hass.data[DOMAIN].get(entry.entry_id)
+        if not data:
+            raise ValueError("Integration not loaded")
+
+        index = data["index"]
+        misses = data["miss_log"].aggregate()
+        for item in misses:
+            ch = index.by_id.get(item["channel_id"]) if item["channel_id"] else None
+            item["channel_name"] = ch["name"] if ch else None
+        return {"misses": misses}
+
+    async def async_promote_aliases(call) -> dict:
+        """Promote recurring fuzzy matches (or a given name) to exact aliases."""
+        entry = get_target_entry(call)
+        if not entry:
+            raise ValueError("No TV Channel Mapping configuration found.")
+
+        data = hass.data[DOMAIN].get(entry.entry_id)
+        if not data:
+            raise ValueError("Integration not loaded")
+
+        index = data["index"]
+        miss_log = data["miss_log"]
+        utterance = call.data.get("utterance")
+        channel_name = call.data.get("channel_name")
+
+        if utterance:
+            # Manual promotion, e.g. for a recurring miss
+            if not channel_name:
+                raise ValueError("channel_name is required together with utterance")
+            resolution = index.resolve(channel_name)
+            if resolution.channel is None:
+                raise ValueError(f"Channel '{channel_name}' not found")
+            candidates = {normalize_name(utterance): resolution.channel["id"]}
+        else:
+            min_count = call.data.get("min_count", DEFAULT_ALIAS_MIN_COUNT)
+            candidates = miss_log.suggestions(min_count)
+
+        # Skip names that already resolve exactly
+        promoted = {
+            alias: c_id for alias, c_id in candidates.items()
+            if c_id in index.by_id
+            and alias not in index.by_name
+            and alias not in index.by_alias
+        }
+        if not promoted:
+            return {"promoted": {}}
+
+        miss_log.forget(set(promoted))
+        aliases = dict(entry.options.get("aliases", {}))
+        aliases.update(promoted)
+        new_options = dict(entry.options)
+        new_options["aliases"] = aliases
+        # Updating options reloads the entry, which rebuilds the index with the aliases
+        hass.config_entries.async_update_entry(entry, options=new_options)
+
+        _LOGGER.info(f"Promoted {len(promoted)} utterances to channel aliases")
+        return {
+            "promoted": {
+                alias: index.by_id[c_id]["name"] for alias, c_id in promoted.items()
+            }
+        }
+
+    async def async_resolve_channel(call) -> dict:
+        """Resolve channel names without tuning the TV."""
+        entry = get_target_entry(call)
+        if not entry:
+            raise ValueError("No TV Channel Mapping configuration found.")
+
+        data = hass.data[DOMAIN].get(entry.entry_id)
+        if not data:
+            raise ValueError("Integration not loaded")
+
+        mask = profile_mask(hass, data["profiles"], call.data.get("profile"), call.context.user_id)
+        return {
+            "results": _resolve_channel_names(
+                data["index"], call.data["names"], call.data["alternatives"], mask
+            )
+        }
 
     import voluptuous as vol
     from homeassistant.core import SupportsResponse
+    from homeassistant.helpers import config_validation as cv
 
     if hass.services.has_service(DOMAIN, "tune_channel"):
         return
@@ -166,10 +359,89 @@ async def async_register_global_services(hass: HomeAssistant):
         supports_response=SupportsResponse.ONLY
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        "resolve_channel",
+        async_resolve_channel,
+        schema=vol.Schema({
+            vol.Required("names"): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("alternatives", default=DEFAULT_ALTERNATIVES): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=10)
+            ),
+            vol.Optional("profile"): cv.string,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
 
+    hass.services.async_register(
+        DOMAIN,
+        "get_miss_log",
+        async_get_miss_log,
+        supports_response=SupportsResponse.ONLY
+    )
 
-async def _async_tune_channel_logic(hass: HomeAssistant, entry: ConfigEntry, channel_name_input: str):
-    """Reusable logic for tuning the channel."""
+    hass.services.async_register(
+        DOMAIN,
+        "promote_aliases",
+        async_promote_aliases,
+        schema=vol.Schema({
+            vol.Optional("min_count"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional("utterance"): str,
+            vol.Optional("channel_name"): str,
+        }),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+
+
+
+def _visible_channel_names(index, mask: int | None) -> list[str]:
+    """Return the sorted names of the channels visible in a profile mask."""
+    return sorted(
+        ch["name"] for ch in index.visible_channels(mask) if ch["id"] not in index.shadowed
+    )
+
+
+def _resolve_channel_names(
+    index, names: list[str], alternatives: int, mask: int | None = None
+) -> list[dict]:
+    """Resolve a batch of channel names against the index (dry run, nothing is tuned)."""
+    results = []
+    for name in names:
+        resolution = index.resolve(name, mask)
+        ch = resolution.channel
+        results.append({
+            "name": name,
+            "found": ch is not None,
+            "channel_name": ch["name"] if ch else None,
+            "number": ch["number"] if ch else None,
+            "stage": resolution.stage,
+            "score": round(resolution.score, 3),
+            "alternatives": [
+                {
+                    "channel_name": alt.channel["name"],
+                    "number": alt.channel["number"],
+                    "stage": alt.stage,
+                    "score": round(alt.score, 3),
+                }
+                for alt in index.alternatives(name, alternatives, ch["id"] if ch else None, mask)
+            ] if alternatives else [],
+        })
+    return results
+
+
+async def _async_tune_channel_logic(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    channel_name_input: str,
+    profile: str | None = None,
+    user_id: str | None = None,
+    device_id: str | None = None,
+):
+    """Reusable logic for tuning the channel.
+
+    Only channels visible in the profile that applies to the request (explicit,
+    by user, by the area of the device, or by time window) can be tuned.
+    """
     if not channel_name_input:
         _LOGGER.error("No channel name provided")
         raise ValueError("No channel name provided")
@@ -179,77 +451,25 @@ async def _async_tune_channel_logic(hass: HomeAssistant, entry: ConfigEntry, cha
         _LOGGER.error("Integration not loaded properly")
         raise ValueError("Integration not loaded")
 
-    # Base channels is a LIST of dicts
-    provider_channels_list = data.get("base_channels", [])
-    
-    # Apply Options
-    options = entry.options
-    custom_channels_list = options.get("custom_channels", [])
-    deleted_channels = options.get("deleted_channels", [])
-    overrides = options.get("overrides", {}) # Renames are stored here
-
-    # Build a master map keyed by ID to handle merges and deletions easily
-    # Start with provider channels
-    all_channels_map = {ch["id"]: ch for ch in provider_channels_list}
-    
-    # Add/Overwrite with custom channels
-    for ch in custom_channels_list:
-        all_channels_map[ch["id"]] = ch
-
-    # Filter out deleted channels
-    active_channels_map = {
-        c_id: ch_data for c_id, ch_data in all_channels_map.items()
-        if c_id not in deleted_channels
-    }
+    mask = profile_mask(hass, data["profiles"], profile, user_id, device_id)
+    resolution = data["index"].resolve(channel_name_input, mask)
+    if should_record(resolution.stage):
+        data["miss_log"].record(
+            channel_name_input,
+            resolution.channel["id"] if resolution.channel else None,
+            resolution.stage,
+        )
 
-    # Find target channel number
-    target_number = None
-    target_name_match = channel_name_input.lower().strip()
-
-    # 1. Exact match attempt
-    for c_id, ch_data in active_channels_map.items():
-        name = overrides.get(c_id, ch_data["name"]).lower()
-        if name == target_name_match:
-            target_number = ch_data["number"]
-            break
-            
-    # 2. Substring match attempt (New)
-    # If the user says "RTL", we should match "RTL HD" or "RTL Klub" before trying fuzzy matching.
-    if not target_number:
-        for c_id, ch_data in active_channels_map.items():
-            name = overrides.get(c_id, ch_data["name"]).lower()
-            # Check if input is a word-boundary substring of the channel name
-            # e.g. "rtl" in "rtl hd" -> True
-            if target_name_match in name.split(): 
-                target_number = ch_data["number"]
-                _LOGGER.info(f"Substring matched '{channel_name_input}' to '{overrides.get(c_id, ch_data['name'])}'")
-                break
-            # Also check if it's a prefix (e.g. "film+" matches "film+ hd")
-            if name.startswith(target_name_match):
-                target_number = ch_data["number"]
-                _LOGGER.info(f"Prefix matched '{channel_name_input}' to '{overrides.get(c_id, ch_data['name'])}'")
-                break
-    
-    # 3. Fuzzy match attempt (if exact and substring fail)
-    if not target_number:
-        import difflib
-        # Create a map of name -> number for all active channels
-        name_to_number = {}
-        for c_id, ch_data in active_channels_map.items():
-            name = overrides.get(c_id, ch_data["name"]).lower()
-            name_to_number[name] = ch_data["number"]
-        
-        # Find close matches
-        matches = difflib.get_close_matches(target_name_match, name_to_number.keys(), n=1, cutoff=0.6)
-        if matches:
-            best_match = matches[0]
-            target_number = name_to_number[best_match]
-            _LOGGER.info(f"Fuzzy matched '{channel_name_input}' to '{best_match}'")
-
-    if not target_number:
+    if resolution.channel is None:
         _LOGGER.warning(f"Channel '{channel_name_input}' not found in active channel list.")
         raise ValueError(f"Channel '{channel_name_input}' not found")
 
+    target_number = resolution.channel["number"]
+    if resolution.stage == STAGE_SUBSTRING:
+        _LOGGER.info(f"Substring matched '{channel_name_input}' to '{resolution.channel['name']}'")
+    elif resolution.stage == STAGE_FUZZY:
+        _LOGGER.info(f"Fuzzy matched '{channel_name_input}' to '{resolution.channel['name']}'")
+
     target_tv = entry.data.get("tv_entity")
     if not target_tv:
             _LOGGER.error("No target TV entity configured")
@@ -300,7 +520,13 @@ if llm:
         async def async_call(self, hass: HomeAssistant, tool_input: llm.ToolInput, llm_context: llm.LLMContext) -> dict:
             """Call the tool."""
             channel_name = tool_input.tool_args["channel_name"]
-            await _async_tune_channel_logic(hass, self.entry, channel_name)
+            await _async_tune_channel_logic(
+                hass,
+                self.entry,
+                channel_name,
+                user_id=llm_context.context.user_id if llm_context.context else None,
+                device_id=llm_context.device_id,
+            )
             return {"success": True, "message": f"Tuned to {channel_name}"}
 
     class TvChannelListTool(llm.Tool):
@@ -322,37 +548,54 @@ if llm:
 
         async def async_call(self, hass: HomeAssistant, tool_input: llm.ToolInput, llm_context: llm.LLMContext) -> dict:
             """Call the tool."""
-            # Reuse the logic from the service
-            
             data = hass.data[DOMAIN].get(self.entry.entry_id)
             if not data:
                 return {"error": "Integration not loaded"}
 
-            options = self.entry.options
-            provider_channels_list = data.get("base_channels", [])
-            custom_channels_list = options.get("custom_channels", [])
-            deleted_channels = options.get("deleted_channels", [])
-            overrides = options.get("overrides", {})
-
-            all_channels_map = {ch["id"]: ch for ch in provider_channels_list}
-            for ch in custom_channels_list:
-                all_channels_map[ch["id"]] = ch
-
-            active_channels = []
-            for c_id, ch_data in all_channels_map.items():
-                if c_id not in deleted_channels:
-                    name = overrides.get(c_id, ch_data["name"])
-                    active_channels.append(name)
-            
-            active_channels.sort()
-            return {"channels": active_channels}
+            mask = profile_mask(
+                hass,
+                data["profiles"],
+                user_id=llm_context.context.user_id if llm_context.context else None,
+                device_id=llm_context.device_id,
+            )
+            return {"channels": _visible_channel_names(data["index"], mask)}
+
+    class TvChannelResolveTool(llm.Tool):
+        """LLM Tool for checking channel names without tuning the TV."""
+
+        def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+            """Init the tool."""
+            self.hass = hass
+            self.entry = entry
+
+        @property
+        def metadata(self) -> llm.ToolMetadata:
+            """Return metadata for the tool."""
+            return llm.ToolMetadata(
+                name="tv_channel_mapping_resolve_channels",
+                description="Checks which TV channels the given names would switch to, without switching. Returns the matched channel, number, match quality and alternatives for each name.",
+                parameters=vol.Schema({
+                    vol.Required("names"): [str],
+                }),
+            )
+
+        async def async_call(self, hass: HomeAssistant, tool_input: llm.ToolInput, llm_context: llm.LLMContext) -> dict:
+            """Call the tool."""
+            data = hass.data[DOMAIN].get(self.entry.entry_id)
+            if not data:
+                return {"error": "Integration not loaded"}
+
+            names = tool_input.tool_args["names"]
+            mask = profile_mask(
+                hass,
+                data["profiles"],
+                user_id=llm_context.context.user_id if llm_context.context else None,
+                device_id=llm_context.device_id,
+            )
+            return {"results": _resolve_channel_names(data["index"], names, DEFAULT_ALTERNATIVES, mask)}
 else:
     # Fallback to avoid NameError if llm is missing
     TvChannelTool = None
     TvChannelListTool = None
+    TvChannelResolveTool = None
 
-
-def load_json_data(path: str) -> dict:
-    """Load JSON data from file."""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
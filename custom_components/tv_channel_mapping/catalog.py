@@ -0,0 +1,325 @@
+"""Provider catalog loading and versioned migration of user customizations."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+from typing import Any
+
+from .channel_index import normalize_name, normalize_number
+from .const import PROVIDERS
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def catalog_key(source: str) -> str:
+    """Return the file name stem of a catalog source ('HU One' -> 'hu_one')."""
+    if source.endswith(".json"):
+        source = source[:-5]
+    return source.lower().replace(" ", "_")
+
+
+def provider_data_path(provider: str) -> str:
+    """Return the path of the bundled data file of a provider."""
+    return os.path.join(DATA_DIR, f"{catalog_key(provider)}.json")
+
+
+def catalog_path(source: str, user_dir: str) -> str:
+    """Return the path of a bundled provider or a user-supplied catalog file."""
+    if source in PROVIDERS:
+        return provider_data_path(source)
+    return os.path.join(user_dir, os.path.basename(source))
+
+
+def list_user_catalogs(user_dir: str) -> list[str]:
+    """Return the user-supplied catalog files (JSON in the same format as data/)."""
+    if not os.path.isdir(user_dir):
+        return []
+    return sorted(name for name in os.listdir(user_dir) if name.endswith(".json"))
+
+
+def load_json_data(path: str) -> dict:
+    """Load JSON data from file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validate_catalog(catalog: Any) -> None:
+    """Raise ValueError if data is not a catalog in the format of data/."""
+    if not isinstance(catalog, dict) or not isinstance(catalog.get("channels"), list):
+        raise ValueError("expected an object with a 'channels' list")
+    try:
+        int(catalog.get("version", 1))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid version {catalog['version']!r}") from None
+    for position, ch in enumerate(catalog["channels"]):
+        if not isinstance(ch, dict) or any(key not in ch for key in ("id", "name", "number")):
+            raise ValueError(f"channel {position} needs an id, a name and a number")
+        if not isinstance(ch["id"], str) or not isinstance(ch["name"], str):
+            raise ValueError(f"channel {position} needs a string id and name")
+
+
+def load_extra_catalogs(
+    provider: str, sources: list[str], user_dir: str
+) -> list[tuple[str, dict[str, Any]]]:
+    """Load the catalogs combined with a provider, skipping unusable files.
+
+    A missing, malformed or invalid file is logged and left out of the
+    lineup rather than failing the whole entry.
+    """
+    catalogs = []
+    for source in sources:
+        if source == provider:
+            continue
+        path = catalog_path(source, user_dir)
+        try:
+            data = load_json_data(path)
+            validate_catalog(data)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
+            _LOGGER.error(f"Skipping provider data file {path}: {e}")
+            continue
+        catalogs.append((source, data))
+    return catalogs
+
+
+def catalog_version(catalog: dict[str, Any]) -> int:
+    """Return the version of a provider catalog (unversioned files count as 1)."""
+    return int(catalog.get("version", 1))
+
+
+def catalog_snapshot(channels: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the minimal copy of a catalog that later versions are diffed against."""
+    return [
+        {"id": ch["id"], "name": ch["name"], "number": ch["number"]}
+        for ch in channels
+    ]
+
+
+def lineup_version(versions: list[tuple[str, int]]) -> int | str:
+    """Return the version of a lineup made of one or more catalogs.
+
+    A single catalog keeps its plain version number; composite lineups get a
+    signature of all sources, so adding, removing or updating any of them
+    triggers a migration.
+    """
+    if len(versions) == 1:
+        return versions[0][1]
+    return "+".join(f"{catalog_key(source)}@{version}" for source, version in versions)
+
+
+def merge_catalogs(
+    catalogs: list[tuple[str, list[dict[str, Any]]]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Merge several catalogs into one lineup, in order of precedence.
+
+    The first catalog keeps its channel IDs, later ones are namespaced by
+    source ('hu_digi:tv-channel-0001') as IDs are only unique per catalog.
+    On a name collision the channel of the earlier catalog wins and the later
+    one is dropped. On a number collision both channels are kept, but the
+    earlier one is what the number maps back to.
+    Returns the merged channels and the conflicts found.
+    """
+    merged: list[dict[str, Any]] = []
+    conflicts: list[dict[str, Any]] = []
+    by_name: dict[str, tuple[str, dict[str, Any]]] = {}
+    by_number: dict[str | None, tuple[str, dict[str, Any]]] = {}
+
+    for position, (source, channels) in enumerate(catalogs):
+        for ch in channels:
+            name_key = normalize_name(ch["name"])
+            if name_key in by_name:
+                winner_source, winner = by_name[name_key]
+                if winner_source != source:
+                    conflicts.append({
+                        "type": "name",
+                        "name": ch["name"],
+                        "kept": f"{winner_source}: {winner['name']} ({winner['number']})",
+                        "dropped": f"{source}: {ch['name']} ({ch['number']})",
+                    })
+                    continue
+
+            c_id = ch["id"] if position == 0 else f"{catalog_key(source)}:{ch['id']}"
+            new_ch = {"id": c_id, "name": ch["name"], "number": ch["number"]}
+
+            number_key = normalize_number(ch["number"])
+            if number_key in by_number:
+                winner_source, winner = by_number[number_key]
+                if winner_source != source:
+                    conflicts.append({
+                        "type": "number",
+                        "number": ch["number"],
+                        "kept": f"{winner_source}: {winner['name']}",
+                        "shadowed": f"{source}: {ch['name']}",
+                    })
+            else:
+                by_number[number_key] = (source, new_ch)
+
+            by_name.setdefault(name_key, (source, new_ch))
+            merged.append(new_ch)
+
+    return merged, conflicts
+
+
+@dataclass
+class CatalogDiff:
+    """Differences between two versions of a provider catalog."""
+
+    # Old channel ID -> new channel ID, for every channel still present
+    id_map: dict[str, str] = field(default_factory=dict)
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    renamed: list[tuple[str, str, str]] = field(default_factory=list)
+    renumbered: list[tuple[str, Any, Any]] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        """Return True if the catalogs differ in any way."""
+        return bool(
+            self.added
+            or self.removed
+            or self.renamed
+            or self.renumbered
+            or any(old != new for old, new in self.id_map.items())
+        )
+
+
+def diff_catalogs(
+    old_channels: list[dict[str, Any]],
+    new_channels: list[dict[str, Any]],
+    match_by: tuple[str, ...] = ("name", "id", "number"),
+) -> CatalogDiff:
+    """Compute the ID/name/number diff between two catalog versions.
+
+    Channel IDs are derived from the channel number in some catalogs, so they
+    are not stable across versions. Channels are matched by name first, then
+    by unchanged ID, then by number; whatever is left is added or removed.
+    IDs and numbers only mean something within one provider, so diffs between
+    different providers should pass match_by=("name",).
+    """
+    diff = CatalogDiff()
+
+    new_by_name: dict[str, dict[str, Any]] = {}
+    new_by_id: dict[str, dict[str, Any]] = {}
+    new_by_number: dict[str, dict[str, Any]] = {}
+    for ch in new_channels:
+        new_by_name.setdefault(normalize_name(ch["name"]), ch)
+        new_by_id[ch["id"]] = ch
+        new_by_number.setdefault(normalize_number(ch["number"]), ch)
+
+    matched: dict[str, dict[str, Any]] = {}
+    used_new_ids: set[str] = set()
+
+    def _match(old: dict[str, Any], new: dict[str, Any] | None) -> bool:
+        if new is None or new["id"] in used_new_ids:
+            return False
+        matched[old["id"]] = new
+        used_new_ids.add(new["id"])
+        return True
+
+    unmatched = list(old_channels)
+    if "name" in match_by:
+        unmatched = [
+            old for old in unmatched
+            if not _match(old, new_by_name.get(normalize_name(old["name"])))
+        ]
+    if "id" in match_by:
+        unmatched = [old for old in unmatched if not _match(old, new_by_id.get(old["id"]))]
+    if "number" in match_by:
+        unmatched = [
+            old for old in unmatched
+            if not _match(old, new_by_number.get(normalize_number(old["number"])))
+        ]
+
+    for old in old_channels:
+        new = matched.get(old["id"])
+        if new is None:
+            continue
+        diff.id_map[old["id"]] = new["id"]
+        if old["name"] != new["name"]:
+            diff.renamed.append((new["id"], old["name"], new["name"]))
+        if normalize_number(old["number"]) != normalize_number(new["number"]):
+            diff.renumbered.append((new["id"], old["number"], new["number"]))
+
+    diff.removed = [old["id"] for old in unmatched]
+    diff.added = [ch["id"] for ch in new_channels if ch["id"] not in used_new_ids]
+    return diff
+
+
+def migrate_options(
+    options: dict[str, Any], diff: CatalogDiff
+) -> tuple[dict[str, Any], dict[str, list[str]]]:
+    """Remap overrides, aliases, profiles and deleted channels through a catalog diff.
+
+    Custom channels are not part of any catalog and are kept as they are.
+    Returns the new options and the customizations that were remapped or
+    dropped because their channel no longer exists.
+    """
+    report: dict[str, list[str]] = {"remapped": [], "dropped": []}
+
+    def _remap(c_id: str) -> str | None:
+        if c_id.startswith("custom-"):
+            return c_id
+        new_id = diff.id_map.get(c_id)
+        if new_id is None:
+            report["dropped"].append(c_id)
+        elif new_id != c_id:
+            report["remapped"].append(f"{c_id} -> {new_id}")
+        return new_id
+
+    overrides = {}
+    for c_id, name in options.get("overrides", {}).items():
+        if (new_id := _remap(c_id)) is not None:
+            overrides[new_id] = name
+
+    deleted_channels = []
+    for c_id in options.get("deleted_channels", []):
+        if (new_id := _remap(c_id)) is not None and new_id not in deleted_channels:
+            deleted_channels.append(new_id)
+
+    aliases = {}
+    for alias, c_id in options.get("aliases", {}).items():
+        if (new_id := _remap(c_id)) is not None:
+            aliases[alias] = new_id
+
+    profiles = {}
+    for name, conf in options.get("profiles", {}).items():
+        channels = [
+            new_id for c_id in conf.get("channels", [])
+            if (new_id := _remap(c_id)) is not None
+        ]
+        profiles[name] = {**conf, "channels": channels}
+
+    new_options = dict(options)
+    if "profiles" in options:
+        new_options["profiles"] = profiles
+    if "aliases" in options:
+        new_options["aliases"] = aliases
+    if "overrides" in options:
+        new_options["overrides"] = overrides
+    if "deleted_channels" in options:
+        new_options["deleted_channels"] = deleted_channels
+    return new_options, report
+
+
+def format_migration_report(
+    old_version: int | str | None,
+    new_version: int | str,
+    diff: CatalogDiff,
+    report: dict[str, list[str]],
+) -> str:
+    """Return a human readable summary of a catalog migration."""
+    lines = [
+        f"Channel catalog updated from version {old_version} to {new_version}.",
+        f"- Added channels: {len(diff.added)}",
+        f"- Removed channels: {len(diff.removed)}",
+        f"- Renamed channels: {len(diff.renamed)}",
+        f"- Renumbered channels: {len(diff.renumbered)}",
+        f"- Customizations moved to a new channel ID: {len(report['remapped'])}",
+        f"- Customizations dropped (channel removed): {len(report['dropped'])}",
+    ]
+    if report["dropped"]:
+        lines.append(f"Dropped: {', '.join(report['dropped'])}")
+    return "\n".join(lines)
@@ -0,0 +1,280 @@
+"""Precomputed channel lookups for the TV Channel Mapping integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import difflib
+from typing import Any
+
+# Resolution stages, from cheapest to most expensive
+STAGE_EXACT = "exact"
+STAGE_ALIAS = "alias"
+STAGE_SUBSTRING = "substring"
+STAGE_FUZZY = "fuzzy"
+
+FUZZY_CUTOFF = 0.6
+# Looser cutoff for suggesting alternatives than for picking a channel
+ALTERNATIVE_CUTOFF = 0.4
+
+
+def normalize_number(number: Any) -> str | None:
+    """Normalize a channel number (int or str) to a lookup key.
+
+    TVs report the current channel in many shapes ("7", "007", 7, " 7 "),
+    so numeric values are reduced to their plain integer form.
+    """
+    if number is None:
+        return None
+    text = str(number).strip()
+    if not text:
+        return None
+    if text.isdigit():
+        return str(int(text))
+    return text
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a channel name to a lookup key."""
+    return name.lower().strip()
+
+
+@dataclass
+class Resolution:
+    """Outcome of resolving a spoken or typed channel name."""
+
+    channel: dict[str, Any] | None
+    stage: str | None = None
+    score: float = 0.0
+
+
+class ChannelIndex:
+    """Active lineup of an entry with name and number lookups.
+
+    Built once per config entry load (options changes reload the entry), so
+    lookups never have to merge provider, custom and deleted channels again.
+    """
+
+    def __init__(
+        self,
+        channels: list[dict[str, Any]],
+        aliases: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the index from the resolved list of active channels."""
+        self.channels = channels
+        self.by_id: dict[str, dict[str, Any]] = {}
+        self.by_name: dict[str, dict[str, Any]] = {}
+        self.by_alias: dict[str, dict[str, Any]] = {}
+        self.by_number: dict[str, dict[str, Any]] = {}
+        # (normalized name, name tokens, channel) in lineup order for substring matching
+        self._names: list[tuple[str, list[str], dict[str, Any]]] = []
+        # Last channel wins here, as in the original name -> number fuzzy map
+        self._fuzzy_choices: dict[str, dict[str, Any]] = {}
+        # Channel ID -> bit in profile visibility masks, by lineup position
+        self._bits: dict[str, int] = {}
+        # Catalog channels whose name a custom channel took over
+        self.shadowed: set[str] = set()
+        # Custom vs catalog collisions, in the format of merge_catalogs conflicts
+        self.conflicts: list[dict[str, Any]] = []
+
+        # Custom channels apply on top of the catalogs, so they take over the
+        # name and number of any catalog channel they collide with
+        custom_names: dict[str, dict[str, Any]] = {}
+        custom_numbers: dict[str, dict[str, Any]] = {}
+        for ch in channels:
+            if ch.get("custom"):
+                custom_names.setdefault(normalize_name(ch["name"]), ch)
+                if (number_key := normalize_number(ch["number"])) is not None:
+                    custom_numbers.setdefault(number_key, ch)
+
+        for position, ch in enumerate(channels):
+            self.by_id[ch["id"]] = ch
+            self._bits[ch["id"]] = 1 << position
+            name_key = normalize_name(ch["name"])
+            number_key = normalize_number(ch["number"])
+
+            if not ch.get("custom"):
+                if (winner := custom_names.get(name_key)) is not None:
+                    self.shadowed.add(ch["id"])
+                    self.conflicts.append({
+                        "type": "name",
+                        "name": ch["name"],
+                        "kept": f"custom: {winner['name']} ({winner['number']})",
+                        "shadowed": f"{ch['id']}: {ch['name']} ({ch['number']})",
+                    })
+                if (winner := custom_numbers.get(number_key)) is not None:
+                    self.conflicts.append({
+                        "type": "number",
+                        "number": ch["number"],
+                        "kept": f"custom: {winner['name']}",
+                        "shadowed": f"{ch['id']}: {ch['name']}",
+                    })
+                    number_key = None
+
+            if number_key is not None:
+                self.by_number.setdefault(number_key, ch)
+            if ch["id"] in self.shadowed:
+                continue
+            # First channel wins on collisions, matching the lineup order
+            self.by_name.setdefault(name_key, ch)
+            self._names.append((name_key, name_key.split(), ch))
+            self._fuzzy_choices[name_key] = ch
+
+        for alias, c_id in (aliases or {}).items():
+            # Aliases of deleted channels are kept in options but not indexed
+            if (ch := self.by_id.get(c_id)) is not None:
+                self.by_alias.setdefault(normalize_name(alias), ch)
+
+    def mask_for(self, channel_ids: list[str]) -> int:
+        """Return the visibility bitset of the given channels (unknown IDs are ignored)."""
+        mask = 0
+        for c_id in channel_ids:
+            mask |= self._bits.get(c_id, 0)
+        return mask
+
+    def is_visible(self, ch: dict[str, Any], mask: int | None) -> bool:
+        """Return True if a channel is part of a visibility mask (None shows all)."""
+        return mask is None or bool(mask & self._bits[ch["id"]])
+
+    def visible_channels(self, mask: int | None) -> list[dict[str, Any]]:
+        """Return the channels of a visibility mask in lineup order."""
+        if mask is None:
+            return self.channels
+        return [ch for ch in self.channels if mask & self._bits[ch["id"]]]
+
+    def channel_for_number(self, number: Any) -> dict[str, Any] | None:
+        """Return the channel tuned by the given number, if any."""
+        key = normalize_number(number)
+        if key is None:
+            return None
+        return self.by_number.get(key)
+
+    def channel_for_name(self, name: Any, mask: int | None = None) -> dict[str, Any] | None:
+        """Return the visible channel with exactly this (case-insensitive) name or alias."""
+        if not name:
+            return None
+        key = normalize_name(str(name))
+        for ch in (self.by_name.get(key), self.by_alias.get(key)):
+            if ch is not None and self.is_visible(ch, mask):
+                return ch
+        return None
+
+    def _fuzzy_keys(self, mask: int | None):
+        """Return the fuzzy match candidates visible in a mask."""
+        if mask is None:
+            return self._fuzzy_choices.keys()
+        return [
+            key for key, ch in self._fuzzy_choices.items() if mask & self._bits[ch["id"]]
+        ]
+
+    def resolve(self, name: str, mask: int | None = None) -> Resolution:
+        """Resolve a channel name: exact name, alias, substring/prefix, then fuzzy.
+
+        With a profile mask, only channels visible in that profile are matched.
+        """
+        target = normalize_name(name)
+        if not target:
+            # A blank name would prefix-match the first channel
+            return Resolution(None)
+
+        # 1. Exact match (name, then promoted alias)
+        ch = self.by_name.get(target)
+        if ch is not None and self.is_visible(ch, mask):
+            return Resolution(ch, STAGE_EXACT, 1.0)
+        ch = self.by_alias.get(target)
+        if ch is not None and self.is_visible(ch, mask):
+            return Resolution(ch, STAGE_ALIAS, 1.0)
+
+        # 2. Substring match
+        # If the user says "RTL", we should match "RTL HD" or "RTL Klub" before trying fuzzy matching.
+        for name_key, tokens, ch in self._names:
+            if not self.is_visible(ch, mask):
+                continue
+            # Word-boundary substring ("rtl" in "rtl hd") or prefix ("film+" in "film+ hd")
+            if target in tokens or name_key.startswith(target):
+                return Resolution(ch, STAGE_SUBSTRING, len(target) / len(name_key))
+
+        # 3. Fuzzy match
+        matches = difflib.get_close_matches(
+            target, self._fuzzy_keys(mask), n=1, cutoff=FUZZY_CUTOFF
+        )
+        if matches:
+            score = difflib.SequenceMatcher(None, target, matches[0]).ratio()
+            return Resolution(self._fuzzy_choices[matches[0]], STAGE_FUZZY, score)
+
+        return Resolution(None)
+
+    def alternatives(
+        self,
+        name: str,
+        limit: int,
+        exclude_id: str | None = None,
+        mask: int | None = None,
+    ) -> list[Resolution]:
+        """Return up to limit ranked candidates for a name, best first.
+
+        Substring/prefix matches rank ahead of fuzzy ones, mirroring resolve().
+        """
+        target = normalize_name(name)
+        result: list[Resolution] = []
+        seen: set[str] = set()
+        if exclude_id is not None:
+            seen.add(exclude_id)
+
+        substring_hits = [
+            Resolution(ch, STAGE_SUBSTRING, len(target) / len(name_key))
+            for name_key, tokens, ch in self._names
+            if target
+            and self.is_visible(ch, mask)
+            and (target in tokens or name_key.startswith(target))
+        ]
+        substring_hits.sort(key=lambda res: res.score, reverse=True)
+
+        fuzzy_hits = [
+            Resolution(
+                self._fuzzy_choices[match],
+                STAGE_FUZZY,
+                difflib.SequenceMatcher(None, target, match).ratio(),
+            )
+            for match in difflib.get_close_matches(
+                target, self._fuzzy_keys(mask), n=limit + len(seen), cutoff=ALTERNATIVE_CUTOFF
+            )
+        ]
+
+        for res in substring_hits + fuzzy_hits:
+            if res.channel["id"] in seen:
+                continue
+            seen.add(res.channel["id"])
+            result.append(res)
+            if len(result) >= limit:
+                break
+        return result
+
+
+def build_channel_index(
+    base_channels: list[dict[str, Any]], options: dict[str, Any]
+) -> ChannelIndex:
+    """Build the index of active channels from provider data and entry options."""
+    custom_channels = options.get("custom_channels", [])
+    deleted_channels = set(options.get("deleted_channels", []))
+    overrides = options.get("overrides", {})
+
+    # Provider channels first, custom channels added/overwritten by ID
+    all_channels_map = {ch["id"]: ch for ch in base_channels}
+    custom_ids = set()
+    for ch in custom_channels:
+        all_channels_map[ch["id"]] = ch
+        custom_ids.add(ch["id"])
+
+    channels = []
+    for c_id, ch_data in all_channels_map.items():
+        if c_id in deleted_channels:
+            continue
+        channels.append(
+            {
+                "id": c_id,
+                "name": overrides.get(c_id, ch_data["name"]),
+                "number": ch_data["number"],
+                "custom": c_id in custom_ids,
+            }
+        )
+
+    return ChannelIndex(channels, options.get("aliases", {}))
@@ -9,15 +9,45 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import (
+    AreaSelector,
+    AreaSelectorConfig,
+    ConversationAgentSelector,
+    EntitySelector,
+    EntitySelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    TimeSelector,
+)
 import uuid
 
+from .catalog import (
+    catalog_snapshot,
+    catalog_version,
+    diff_catalogs,
+    lineup_version,
+    list_user_catalogs,
+    load_extra_catalogs,
+    load_json_data,
+    merge_catalogs,
+    migrate_options,
+    provider_data_path,
+)
 from .const import (
     DOMAIN, 
     PROVIDERS, 
     CONF_PROVIDER, 
     DEFAULT_PROVIDER, 
-    CONF_TV_ENTITY
+    CONF_TV_ENTITY,
+    CONF_CATALOG_VERSION,
+    CONF_CATALOG_SNAPSHOT,
+    CONF_EXTRA_PROVIDERS,
+    CONF_FAST_PATH,
+    CONF_FALLBACK_AGENT,
+    CONF_FAST_PATH_THRESHOLD,
+    DEFAULT_FAST_PATH_THRESHOLD,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -78,9 +108,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             step_id="menu",
             menu_options=[
                 "select_provider",
+                "combine_providers",
                 "rename_channel",
                 "add_channel",
-                "delete_channel"
+                "delete_channel",
+                "edit_profile",
+                "delete_profile",
+                "fast_path"
             ],
         )
 
@@ -92,12 +126,45 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             new_data = dict(self.config_entry.data)
             new_data[CONF_PROVIDER] = user_input[CONF_PROVIDER]
             new_data[CONF_TV_ENTITY] = user_input[CONF_TV_ENTITY]
-            
+            new_options = self.options.copy()
+
+            old_provider = self.config_entry.data.get(CONF_PROVIDER)
+            if user_input[CONF_PROVIDER] != old_provider:
+                # Carry customizations over to the new lineup instead of wiping them
+                new_provider = user_input[CONF_PROVIDER]
+                new_catalog = await self.hass.async_add_executor_job(
+                    load_json_data, provider_data_path(new_provider)
+                )
+                # Rebuild the lineup as async_setup_entry will, extra catalogs included
+                extras = await self.hass.async_add_executor_job(
+                    load_extra_catalogs,
+                    new_provider,
+                    self.options.get(CONF_EXTRA_PROVIDERS, []),
+                    self.hass.config.path(DOMAIN),
+                )
+                catalogs = [(new_provider, new_catalog), *extras]
+                new_channels, _ = merge_catalogs(
+                    [(source, data["channels"]) for source, data in catalogs]
+                )
+                old_channels = await self._async_get_base_channels()
+                # IDs and numbers of different providers are unrelated, match by name only
+                diff = diff_catalogs(old_channels, new_channels, match_by=("name",))
+                new_options, report = migrate_options(new_options, diff)
+                if (entry_data := self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)):
+                    # Saved on unload, before the reload picks the log up again
+                    entry_data["miss_log"].remap(diff.id_map)
+                _LOGGER.info(
+                    f"Switched provider from {old_provider} to {new_provider}: "
+                    f"{len(report['remapped'])} customizations remapped, "
+                    f"{len(report['dropped'])} dropped"
+                )
+                new_data[CONF_CATALOG_VERSION] = lineup_version(
+                    [(source, catalog_version(data)) for source, data in catalogs]
+                )
+                new_data[CONF_CATALOG_SNAPSHOT] = catalog_snapshot(new_channels)
+
             self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
-            
-            # Reset overrides/customizations when switching provider/tv?
-            self.hass.config_entries.async_update_entry(self.config_entry, options={})
-            return self.async_create_entry(title="", data={})
+            return self.async_create_entry(title="", data=new_options)
 
         current_provider = self.config_entry.data.get(CONF_PROVIDER, DEFAULT_PROVIDER)
         current_tv = self.config_entry.data.get(CONF_TV_ENTITY)
@@ -114,6 +181,38 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             ),
         )
 
+    async def async_step_combine_providers(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Merge further provider catalogs into this entry's lineup."""
+        if user_input is not None:
+            new_options = self.options.copy()
+            new_options[CONF_EXTRA_PROVIDERS] = user_input[CONF_EXTRA_PROVIDERS]
+            return self.async_create_entry(title="", data=new_options)
+
+        # Bundled providers plus JSON files in <config>/tv_channel_mapping/
+        current_provider = self.config_entry.data.get(CONF_PROVIDER)
+        user_catalogs = await self.hass.async_add_executor_job(
+            list_user_catalogs, self.hass.config.path(DOMAIN)
+        )
+        sources = {p: p for p in PROVIDERS if p != current_provider}
+        sources.update({f: f"{f} [User]" for f in user_catalogs})
+
+        return self.async_show_form(
+            step_id="combine_providers",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_EXTRA_PROVIDERS,
+                        default=[
+                            s for s in self.options.get(CONF_EXTRA_PROVIDERS, [])
+                            if s in sources
+                        ],
+                    ): cv.multi_select(sources),
+                }
+            ),
+        )
+
     async def async_step_rename_channel(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -231,6 +330,169 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             ),
         )
 
+    async def async_step_edit_profile(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Name a new profile or pick an existing one to edit."""
+        if not self._get_active_channels_dict():
+             return self.async_abort(reason="no_channels")
+
+        profiles = self.options.get("profiles", {})
+        errors = {}
+        if user_input is not None:
+            if profile_name := user_input["profile_name"].strip():
+                self._selected_profile = profile_name
+                return await self.async_step_edit_profile_details()
+            errors["profile_name"] = "empty_name"
+
+        return self.async_show_form(
+            step_id="edit_profile",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("profile_name"): vol.All(str, vol.Length(min=1)),
+                }
+            ),
+            errors=errors,
+            description_placeholders={"profiles": ", ".join(profiles) or "-"},
+        )
+
+    async def async_step_edit_profile_details(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Create or replace the selected channel visibility profile."""
+        channels = self._get_active_channels_dict()
+        profiles = self.options.get("profiles", {})
+        current = profiles.get(self._selected_profile, {})
+
+        if user_input is not None:
+            # Deleted channels are not offered but stay in the profile, so
+            # restoring them restores their visibility too
+            hidden = [c_id for c_id in current.get("channels", []) if c_id not in channels]
+            profiles = profiles.copy()
+            profiles[self._selected_profile] = {
+                "channels": user_input.get("channels", []) + hidden,
+                "users": user_input.get("users", []),
+                "areas": user_input.get("areas", []),
+                "start": user_input.get("start"),
+                "end": user_input.get("end"),
+            }
+
+            new_options = self.options.copy()
+            new_options["profiles"] = profiles
+            return self.async_create_entry(title="", data=new_options)
+
+        users = {
+            user.id: user.name
+            for user in await self.hass.auth.async_get_users()
+            if not user.system_generated
+        }
+
+        return self.async_show_form(
+            step_id="edit_profile_details",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        "channels",
+                        default=[c_id for c_id in current.get("channels", []) if c_id in channels],
+                    ): cv.multi_select(channels),
+                    vol.Optional(
+                        "users",
+                        default=[u_id for u_id in current.get("users", []) if u_id in users],
+                    ): cv.multi_select(users),
+                    vol.Optional("areas", default=current.get("areas", [])): AreaSelector(
+                        AreaSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        "start", description={"suggested_value": current.get("start")}
+                    ): TimeSelector(),
+                    vol.Optional(
+                        "end", description={"suggested_value": current.get("end")}
+                    ): TimeSelector(),
+                }
+            ),
+            description_placeholders={"profile_name": self._selected_profile},
+        )
+
+    async def async_step_delete_profile(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Delete a channel visibility profile."""
+        profiles = self.options.get("profiles", {})
+        if not profiles:
+             return self.async_abort(reason="no_profiles")
+
+        if user_input is not None:
+            profiles = profiles.copy()
+            profiles.pop(user_input["profile_name"], None)
+
+            new_options = self.options.copy()
+            new_options["profiles"] = profiles
+            return self.async_create_entry(title="", data=new_options)
+
+        return self.async_show_form(
+            step_id="delete_profile",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("profile_name"): vol.In(list(profiles)),
+                }
+            ),
+        )
+
+    async def async_step_fast_path(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Configure the local fast path ahead of the conversation agent."""
+        if user_input is not None:
+            new_options = self.options.copy()
+            new_options[CONF_FAST_PATH] = user_input[CONF_FAST_PATH]
+            new_options[CONF_FALLBACK_AGENT] = user_input.get(CONF_FALLBACK_AGENT)
+            new_options[CONF_FAST_PATH_THRESHOLD] = user_input[CONF_FAST_PATH_THRESHOLD]
+            return self.async_create_entry(title="", data=new_options)
+
+        fallback_agent = self.options.get(CONF_FALLBACK_AGENT)
+        return self.async_show_form(
+            step_id="fast_path",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_FAST_PATH, default=self.options.get(CONF_FAST_PATH, False)
+                    ): bool,
+                    vol.Optional(
+                        CONF_FALLBACK_AGENT,
+                        description={"suggested_value": fallback_agent},
+                    ): ConversationAgentSelector(),
+                    vol.Required(
+                        CONF_FAST_PATH_THRESHOLD,
+                        default=self.options.get(
+                            CONF_FAST_PATH_THRESHOLD, DEFAULT_FAST_PATH_THRESHOLD
+                        ),
+                    ): NumberSelector(
+                        NumberSelectorConfig(
+                            min=0.5, max=1.0, step=0.05, mode=NumberSelectorMode.SLIDER
+                        )
+                    ),
+                }
+            ),
+        )
+
+    async def _async_get_base_channels(self) -> list[dict[str, Any]]:
+        """Return the catalog channels the current customizations refer to."""
+        domain_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        if domain_data:
+            return domain_data["base_channels"]
+
+        snapshot = self.config_entry.data.get(CONF_CATALOG_SNAPSHOT)
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            catalog = await self.hass.async_add_executor_job(
+                load_json_data, provider_data_path(self.config_entry.data[CONF_PROVIDER])
+            )
+        except (FileNotFoundError, ValueError):
+            return []
+        return catalog["channels"]
+
     def _get_active_channels_dict(self, include_names=False):
         """Helper to get currently active channels as ID -> Name dict (for selection)."""
         domain_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
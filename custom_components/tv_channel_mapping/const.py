@@ -12,3 +12,25 @@ PROVIDERS = [
     "HU One",
     "HU Digi",
 ]
+
+# Catalog the entry's customizations were last migrated against
+CONF_CATALOG_VERSION = "catalog_version"
+CONF_CATALOG_SNAPSHOT = "catalog_snapshot"
+
+# Number of missed/fuzzy resolutions remembered per entry
+MISS_LOG_SIZE = 200
+# Fuzzy hits needed before an utterance is promoted to an alias
+DEFAULT_ALIAS_MIN_COUNT = 3
+# Ranked alternatives returned per name by resolve_channel
+DEFAULT_ALTERNATIVES = 3
+
+# Local fast path ahead of the (LLM) conversation agent
+CONF_FAST_PATH = "fast_path"
+CONF_FALLBACK_AGENT = "fallback_agent"
+CONF_FAST_PATH_THRESHOLD = "fast_path_threshold"
+DEFAULT_FAST_PATH_THRESHOLD = 0.85
+
+# Further catalogs merged into the entry's lineup, in order of precedence
+CONF_EXTRA_PROVIDERS = "extra_providers"
+
+INTENT_SWITCH_CHANNEL = "TvChannelSwitch"
@@ -0,0 +1,157 @@
+"""Local-first conversation agent for TV Channel Mapping.
+
+Matches channel switching commands locally, using the sentence templates in
+custom_sentences and the entry's channel index, and only hands everything
+else (and unsure matches) to the configured fallback agent, typically an LLM.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any
+
+from homeassistant.components import conversation
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import MATCH_ALL
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import intent
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import _async_tune_channel_logic
+from .const import (
+    CONF_FALLBACK_AGENT,
+    CONF_FAST_PATH_THRESHOLD,
+    DEFAULT_FAST_PATH_THRESHOLD,
+    DOMAIN,
+)
+from .fast_path import confident_channel, load_sentence_patterns, match_channel_slot
+from .intent import clean_channel_name
+from .profiles import profile_mask
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the TV Channel Mapping fast path agent."""
+    patterns = await hass.async_add_executor_job(load_sentence_patterns)
+    async_add_entities([TVChannelFastPathAgent(hass, entry, patterns)])
+
+
+class TVChannelFastPathAgent(conversation.ConversationEntity):
+    """Conversation agent that handles confident channel commands locally."""
+
+    _attr_has_entity_name = True
+    _attr_name = "TV Channel Fast Path"
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        patterns: dict[str, list[re.Pattern]],
+    ) -> None:
+        """Initialize the agent."""
+        self._hass = hass
+        self._entry = entry
+        self._patterns = patterns
+        self._fallback_agent = entry.options.get(CONF_FALLBACK_AGENT) or conversation.HOME_ASSISTANT_AGENT
+        self._threshold = entry.options.get(CONF_FAST_PATH_THRESHOLD, DEFAULT_FAST_PATH_THRESHOLD)
+        self._hits = 0
+        self._fallbacks = 0
+        self._attr_unique_id = f"{entry.entry_id}_fast_path"
+
+    @property
+    def supported_languages(self) -> list[str] | str:
+        """Return the supported languages (the fallback agent decides for the rest)."""
+        return MATCH_ALL
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the hit-rate counters."""
+        total = self._hits + self._fallbacks
+        return {
+            "local_hits": self._hits,
+            "fallbacks": self._fallbacks,
+            "hit_rate": round(self._hits / total, 3) if total else None,
+            "fallback_agent": self._fallback_agent,
+        }
+
+    async def async_process(
+        self, user_input: conversation.ConversationInput
+    ) -> conversation.ConversationResult:
+        """Handle the command locally if confident, otherwise defer to the fallback agent."""
+        device_id = getattr(user_input, "device_id", None)
+        match = None
+
+        if (slot := match_channel_slot(self._patterns, user_input.text, user_input.language)) is not None:
+            match = self._confident_match(slot, user_input, device_id)
+
+        if match is None:
+            self._fallbacks += 1
+            self.async_write_ha_state()
+            fallback_agent = self._fallback_agent
+            if fallback_agent == self.entity_id:
+                # Never hand a request back to ourselves
+                fallback_agent = conversation.HOME_ASSISTANT_AGENT
+            return await conversation.async_converse(
+                self._hass,
+                text=user_input.text,
+                conversation_id=user_input.conversation_id,
+                context=user_input.context,
+                language=user_input.language,
+                agent_id=fallback_agent,
+                device_id=device_id,
+            )
+
+        candidate, channel_name = match
+        response = intent.IntentResponse(language=user_input.language)
+        try:
+            # Tune the candidate as heard, so fuzzy hits still reach the miss log
+            await _async_tune_channel_logic(
+                self._hass,
+                self._entry,
+                candidate,
+                user_id=user_input.context.user_id,
+                device_id=device_id,
+            )
+        except (ValueError, HomeAssistantError) as e:
+            _LOGGER.warning(f"Fast path failed to tune '{channel_name}': {e}")
+            response.async_set_error(
+                intent.IntentResponseErrorCode.FAILED_TO_HANDLE,
+                f"Could not switch to {channel_name}",
+            )
+            return conversation.ConversationResult(
+                response=response, conversation_id=user_input.conversation_id
+            )
+
+        self._hits += 1
+        self.async_write_ha_state()
+        _LOGGER.debug(f"Fast path handled '{user_input.text}' locally as '{channel_name}'")
+
+        response.async_set_speech(f"Switched to {channel_name}")
+        return conversation.ConversationResult(
+            response=response, conversation_id=user_input.conversation_id
+        )
+
+    def _confident_match(
+        self, slot: str, user_input: conversation.ConversationInput, device_id: str | None
+    ) -> tuple[str, str] | None:
+        """Resolve the slot and return the matched candidate and channel name if confident."""
+        data = self._hass.data[DOMAIN].get(self._entry.entry_id)
+        if not data:
+            return None
+
+        mask = profile_mask(
+            self._hass, data["profiles"], user_id=user_input.context.user_id, device_id=device_id
+        )
+        match = confident_channel(
+            data["index"], slot, self._threshold, clean_channel_name, mask
+        )
+        if match is None:
+            return None
+        candidate, channel = match
+        return candidate, channel["name"]
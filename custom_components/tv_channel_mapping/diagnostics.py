@@ -0,0 +1,38 @@
+"""Diagnostics support for TV Channel Mapping."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_CATALOG_SNAPSHOT, CONF_CATALOG_VERSION, DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    # The snapshot is a full copy of the catalog, the version is enough here
+    entry_data = {k: v for k, v in entry.data.items() if k != CONF_CATALOG_SNAPSHOT}
+
+    diagnostics: dict[str, Any] = {
+        "entry_data": entry_data,
+        "options": dict(entry.options),
+    }
+    if not data:
+        return diagnostics
+
+    index = data["index"]
+    diagnostics["lineup"] = {
+        "catalog_version": entry.data.get(CONF_CATALOG_VERSION),
+        "sources": data["sources"],
+        "base_channels": len(data["base_channels"]),
+        "active_channels": len(index.channels),
+        "aliases": len(index.by_alias),
+        "profiles": list(data["profiles"]),
+    }
+    diagnostics["conflicts"] = data["conflicts"] + index.conflicts
+    diagnostics["misses"] = data["miss_log"].aggregate()
+    return diagnostics
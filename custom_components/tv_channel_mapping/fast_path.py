@@ -0,0 +1,138 @@
+"""Sentence matching and confidence rules of the local fast path.
+
+Kept free of Home Assistant imports so the resolver harness can exercise
+the same rules the conversation agent applies.
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Callable
+
+import yaml
+
+from .channel_index import STAGE_FUZZY, STAGE_SUBSTRING, ChannelIndex, normalize_name
+from .const import INTENT_SWITCH_CHANNEL
+
+SENTENCES_DIR = os.path.join(os.path.dirname(__file__), "custom_sentences")
+SLOT_NAME = "channel_name"
+
+# Picture quality tags that say nothing about which channel is meant
+QUALITY_TOKENS = {"hd", "sd", "fhd", "uhd", "4k"}
+
+
+def _expand(template: str, pos: int = 0, closing: str = "") -> tuple[list[str], int]:
+    """Expand a template (from pos up to the closing bracket) into all variants."""
+    alternatives: list[str] = []
+    variants = [""]
+    while pos < len(template):
+        char = template[pos]
+        if char in "[(":
+            inner, pos = _expand(template, pos + 1, "]" if char == "[" else ")")
+            if char == "[":
+                inner = inner + [""]
+            variants = [v + i for v in variants for i in inner]
+        elif char == "|" and closing:
+            alternatives.extend(variants)
+            variants = [""]
+        elif char == closing:
+            return alternatives + variants, pos
+        else:
+            variants = [v + char for v in variants]
+        pos += 1
+    return alternatives + variants, pos
+
+
+def compile_sentence(template: str) -> list[re.Pattern]:
+    """Compile a custom_sentences template into regular expressions.
+
+    Supports the subset of the template syntax used by this integration:
+    [optional] parts, (a|b) and [a|b] alternatives and the {channel_name}
+    slot. Every variant becomes its own pattern, so a skipped optional word
+    can never be swallowed by the slot.
+    """
+    patterns = []
+    for variant in _expand(template)[0]:
+        # Skipped optional parts leave double spaces behind
+        variant = " ".join(variant.split())
+        before, _, after = variant.partition("{" + SLOT_NAME + "}")
+        patterns.append(
+            re.compile(
+                "^" + re.escape(before) + f"(?P<{SLOT_NAME}>.+)" + re.escape(after) + "$",
+                re.IGNORECASE,
+            )
+        )
+    return patterns
+
+
+def load_sentence_patterns() -> dict[str, list[re.Pattern]]:
+    """Load and compile the channel switching sentences per language."""
+    patterns: dict[str, list[re.Pattern]] = {}
+    for language in sorted(os.listdir(SENTENCES_DIR)):
+        path = os.path.join(SENTENCES_DIR, language, "tv_control.yaml")
+        if not os.path.isfile(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+        compiled = patterns.setdefault(language, [])
+        for block in data["intents"][INTENT_SWITCH_CHANNEL]["data"]:
+            for sentence in block["sentences"]:
+                compiled.extend(compile_sentence(sentence))
+        # Most specific first: "Válts az {x}" must win over "Válts {x}"
+        compiled.sort(key=lambda pattern: len(pattern.pattern), reverse=True)
+    return patterns
+
+
+def match_channel_slot(patterns: dict[str, list[re.Pattern]], text: str, language: str | None) -> str | None:
+    """Return the channel name slot if the text is a channel switching command."""
+    text = " ".join(text.strip().rstrip(".!?").split())
+    language = (language or "").split("-")[0].lower()
+    # Try the request's language first, then the others
+    for lang in sorted(patterns, key=lambda lang: lang != language):
+        for pattern in patterns[lang]:
+            if match := pattern.match(text):
+                return match.group(SLOT_NAME)
+    return None
+
+
+def token_coverage(candidate: str, channel_name: str) -> float:
+    """Return the share of the channel name's meaningful words the candidate names.
+
+    "RTL" covers all of "RTL HD", while "tv" covers only a third of
+    "M2 HD/Petőfi TV HD", so generic words do not count as confident.
+    """
+    name_tokens = [t for t in re.split(r"[\s/()]+", normalize_name(channel_name)) if t]
+    meaningful = [t for t in name_tokens if t not in QUALITY_TOKENS] or name_tokens
+    candidate_tokens = set(normalize_name(candidate).split())
+    covered = sum(1 for token in meaningful if token in candidate_tokens)
+    return covered / len(meaningful)
+
+
+def confident_channel(
+    index: ChannelIndex,
+    slot: str,
+    threshold: float,
+    clean: Callable[[str], str],
+    mask: int | None = None,
+) -> tuple[str, dict[str, Any]] | None:
+    """Resolve a slot and return the matched candidate and channel if confident.
+
+    Exact and alias matches always are. Substring matches are scored by how
+    much of the channel name they cover, fuzzy matches by similarity; both
+    have to reach the threshold, everything else goes to the fallback agent.
+    The candidate is the form of the slot that matched, so tuning it again
+    resolves (and logs) the same way.
+    """
+    for candidate in dict.fromkeys((slot, clean(slot.lower()))):
+        resolution = index.resolve(candidate, mask)
+        if resolution.channel is None:
+            continue
+        if resolution.stage == STAGE_SUBSTRING:
+            score = token_coverage(candidate, resolution.channel["name"])
+        elif resolution.stage == STAGE_FUZZY:
+            score = resolution.score
+        else:
+            return candidate, resolution.channel
+        if score >= threshold:
+            return candidate, resolution.channel
+    return None
@@ -8,18 +8,34 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import intent
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN, CONF_TV_ENTITY
+from .const import DOMAIN, CONF_TV_ENTITY, INTENT_SWITCH_CHANNEL
+from .profiles import profile_mask
 
 _LOGGER = logging.getLogger(__name__)
 
-INTENT_SWITCH_CHANNEL = "TvChannelSwitch"
-
 
 async def async_setup_intents(hass: HomeAssistant) -> None:
     """Set up intents for the integration."""
     intent.async_register(hass, SwitchChannelIntent())
 
 
+def clean_channel_name(channel_name_raw: str) -> str:
+    """Strip Hungarian suffixes (-ra, -re) from a spoken channel name.
+
+    Examples: rtl-re, tv2-re, hbo-ra
+    """
+    if channel_name_raw.endswith("-re"):
+         return channel_name_raw[:-3]
+    if channel_name_raw.endswith("-ra"):
+         return channel_name_raw[:-3]
+    if channel_name_raw.endswith("re") and len(channel_name_raw) > 2:
+         # Basic heuristic for "RTLre" (if STT misses hyphen)
+         return channel_name_raw[:-2]
+    if channel_name_raw.endswith("ra") and len(channel_name_raw) > 2:
+         return channel_name_raw[:-2]
+    return channel_name_raw
+
+
 class SwitchChannelIntent(intent.IntentHandler):
     """Handle switching TV channels."""
 
@@ -33,19 +49,7 @@ class SwitchChannelIntent(intent.IntentHandler):
         hass = intent_obj.hass
         slots = self.async_validate_slots(intent_obj.slots)
         channel_name_raw = slots["channel_name"]["value"].lower()
-
-        # Handle Hungarian suffixes (-ra, -re)
-        # Examples: rtl-re, tv2-re, hbo-ra
-        channel_name_clean = channel_name_raw
-        if channel_name_raw.endswith("-re"):
-             channel_name_clean = channel_name_raw[:-3]
-        elif channel_name_raw.endswith("-ra"):
-             channel_name_clean = channel_name_raw[:-3]
-        elif channel_name_raw.endswith("re") and len(channel_name_raw) > 2:
-             # Basic heuristic for "RTLre" (if STT misses hyphen)
-             channel_name_clean = channel_name_raw[:-2]
-        elif channel_name_raw.endswith("ra") and len(channel_name_raw) > 2:
-             channel_name_clean = channel_name_raw[:-2]
+        channel_name_clean = clean_channel_name(channel_name_raw)
 
         _LOGGER.debug("Received intent to switch channel. Raw: %s, Cleaned: %s", channel_name_raw, channel_name_clean)
 
@@ -68,47 +72,27 @@ class SwitchChannelIntent(intent.IntentHandler):
             if not target_tv:
                 continue
 
-            # Reconstruct mapping (logic duped from sensor.py, ideally refactor)
-            base_channels = data["base_channels"]
-            overrides = cfg_entry.options.get("overrides", {})
-            custom_channels = cfg_entry.options.get("custom_channels", [])
-            deleted_channels = cfg_entry.options.get("deleted_channels", [])
-
-            found_number = None
-            
-            # Helper to check match
-            def check_match(name_to_check):
-                name_norm = name_to_check.lower()
-                # Exact match against raw or clean
-                if name_norm == channel_name_raw: 
-                    return True
-                if name_norm == channel_name_clean:
-                    return True
-                return False
-
-            # Check base
-            for ch in base_channels:
-                if ch["id"] in deleted_channels:
-                    continue
-                c_name = overrides.get(ch["id"], ch["name"])
-                if check_match(c_name):
-                    found_number = ch["number"]
-                    break
-            
-            # Check custom
-            if found_number is None:
-                for ch in custom_channels:
-                    c_name = overrides.get(ch["id"], ch["name"])
-                    if check_match(c_name):
-                        found_number = ch["number"]
-                        break
-            
-            if found_number is not None:
-                target_number = found_number
+            # Only channels visible to the speaker's profile (user or area of the satellite)
+            mask = profile_mask(
+                hass,
+                data["profiles"],
+                user_id=intent_obj.context.user_id,
+                device_id=getattr(intent_obj, "device_id", None),
+            )
+
+            # Exact match (name or promoted alias) against raw or clean
+            index = data["index"]
+            channel = index.channel_for_name(channel_name_raw, mask) or index.channel_for_name(channel_name_clean, mask)
+
+            if channel is not None:
+                target_number = channel["number"]
                 entry = cfg_entry
                 break
         
         if target_number is None:
+            # Only a miss if no entry knows the name
+            for data in hass.data[DOMAIN].values():
+                data["miss_log"].record(channel_name_clean, None, None)
             raise intent.IntentHandleError(f"Channel '{channel_name_clean}' not found.")
 
         _LOGGER.info("Switching %s to channel %s (%s)", target_tv, channel_name_clean, target_number)
@@ -0,0 +1,126 @@
+"""Per-entry log of failed and fuzzy channel resolutions."""
+from __future__ import annotations
+
+from collections import Counter, deque
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .channel_index import STAGE_FUZZY, normalize_name
+from .const import DOMAIN, MISS_LOG_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+
+class MissLog:
+    """Bounded ring buffer of utterances that missed or only matched fuzzily.
+
+    Recurring entries point at speech-to-text variants that are worth
+    promoting to exact aliases, so they stop going through fuzzy matching.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, size: int = MISS_LOG_SIZE) -> None:
+        """Initialize the miss log."""
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.misses")
+        self._records: deque[dict[str, Any]] = deque(maxlen=size)
+
+    async def async_load(self) -> None:
+        """Load persisted records."""
+        data = await self._store.async_load()
+        if data:
+            self._records.extend(data.get("records", []))
+
+    async def async_remove(self) -> None:
+        """Delete the persisted records."""
+        await self._store.async_remove()
+
+    async def async_save(self) -> None:
+        """Persist records immediately."""
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"records": list(self._records)}
+
+    def record(self, utterance: str, channel_id: str | None, stage: str | None) -> None:
+        """Record a miss (no channel) or a fuzzy-only hit."""
+        self._records.append(
+            {
+                "utterance": normalize_name(utterance),
+                "channel_id": channel_id,
+                "stage": stage,
+                "time": time.time(),
+            }
+        )
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def aggregate(self) -> list[dict[str, Any]]:
+        """Return per-utterance frequencies, most frequent first."""
+        totals: Counter[str] = Counter()
+        misses: Counter[str] = Counter()
+        targets: dict[str, Counter[str]] = {}
+
+        for rec in self._records:
+            utterance = rec["utterance"]
+            totals[utterance] += 1
+            if rec["channel_id"] is None:
+                misses[utterance] += 1
+            else:
+                targets.setdefault(utterance, Counter())[rec["channel_id"]] += 1
+
+        result = []
+        for utterance, count in totals.most_common():
+            entry: dict[str, Any] = {
+                "utterance": utterance,
+                "count": count,
+                "misses": misses[utterance],
+                "fuzzy_hits": count - misses[utterance],
+                "channel_id": None,
+            }
+            if utterance in targets:
+                entry["channel_id"] = targets[utterance].most_common(1)[0][0]
+            result.append(entry)
+        return result
+
+    def suggestions(self, min_count: int) -> dict[str, str]:
+        """Return utterance -> channel ID for fuzzy hits seen at least min_count times."""
+        return {
+            item["utterance"]: item["channel_id"]
+            for item in self.aggregate()
+            if item["channel_id"] is not None and item["fuzzy_hits"] >= min_count
+        }
+
+    def remap(self, id_map: dict[str, str]) -> None:
+        """Move records to new channel IDs after a catalog change.
+
+        Records of channels that no longer exist are dropped; misses and
+        custom channels are kept as they are.
+        """
+        kept = []
+        for rec in self._records:
+            c_id = rec["channel_id"]
+            if c_id is None or c_id.startswith("custom-"):
+                kept.append(rec)
+            elif (new_id := id_map.get(c_id)) is not None:
+                kept.append({**rec, "channel_id": new_id})
+        self._records.clear()
+        self._records.extend(kept)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def forget(self, utterances: set[str]) -> None:
+        """Drop all records of the given (normalized) utterances."""
+        kept = [rec for rec in self._records if rec["utterance"] not in utterances]
+        self._records.clear()
+        self._records.extend(kept)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+
+def should_record(stage: str | None) -> bool:
+    """Return True if a resolution stage belongs in the miss log."""
+    return stage is None or stage == STAGE_FUZZY
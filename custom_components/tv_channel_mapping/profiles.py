@@ -0,0 +1,114 @@
+"""Channel visibility profiles for the TV Channel Mapping integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import dt as dt_util
+
+from .channel_index import ChannelIndex
+
+
+@dataclass
+class Profile:
+    """Named view of the lineup, e.g. for the kids' room or guests.
+
+    The allowed channels are kept as a bitset over the entry's channel index,
+    so all profiles share one lineup and a visibility check is a single AND.
+    """
+
+    name: str
+    mask: int
+    users: list[str] = field(default_factory=list)
+    areas: list[str] = field(default_factory=list)
+    start: time | None = None
+    end: time | None = None
+
+    def in_time_window(self, now: datetime) -> bool:
+        """Return True if the profile's time window covers now."""
+        if self.start is None or self.end is None:
+            return False
+        current = now.time()
+        if self.start <= self.end:
+            return self.start <= current < self.end
+        # Window wraps around midnight, e.g. 20:00 - 06:00
+        return current >= self.start or current < self.end
+
+
+def _parse_time(value: str | None) -> time | None:
+    """Parse a HH:MM[:SS] string from the options."""
+    if not value:
+        return None
+    return time.fromisoformat(value)
+
+
+def build_profiles(index: ChannelIndex, options: dict[str, Any]) -> dict[str, Profile]:
+    """Build the profiles of an entry with their masks precomputed."""
+    profiles = {}
+    for name, conf in options.get("profiles", {}).items():
+        profiles[name] = Profile(
+            name=name,
+            mask=index.mask_for(conf.get("channels", [])),
+            users=conf.get("users", []),
+            areas=conf.get("areas", []),
+            start=_parse_time(conf.get("start")),
+            end=_parse_time(conf.get("end")),
+        )
+    return profiles
+
+
+def select_profile(
+    profiles: dict[str, Profile],
+    now: datetime,
+    name: str | None = None,
+    user_id: str | None = None,
+    area_id: str | None = None,
+) -> Profile | None:
+    """Pick the profile that applies to a request.
+
+    An explicitly named profile wins, then one assigned to the user, then one
+    assigned to the area, then one whose time window is active. Without a
+    match the full lineup is visible.
+    """
+    if name:
+        if name not in profiles:
+            raise ValueError(f"Profile '{name}' not found")
+        return profiles[name]
+
+    if user_id:
+        for profile in profiles.values():
+            if user_id in profile.users:
+                return profile
+
+    if area_id:
+        for profile in profiles.values():
+            if area_id in profile.areas:
+                return profile
+
+    for profile in profiles.values():
+        if profile.in_time_window(now):
+            return profile
+
+    return None
+
+
+def profile_mask(
+    hass: HomeAssistant,
+    profiles: dict[str, Profile],
+    name: str | None = None,
+    user_id: str | None = None,
+    device_id: str | None = None,
+) -> int | None:
+    """Return the visibility mask for a request (None shows all channels)."""
+    if not profiles and not name:
+        return None
+
+    area_id = None
+    if device_id and (device := dr.async_get(hass).async_get(device_id)) is not None:
+        area_id = device.area_id
+
+    profile = select_profile(profiles, dt_util.now(), name, user_id, area_id)
+    return profile.mask if profile else None
@@ -7,10 +7,12 @@ from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_OFF, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, State, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_state_change_event
 
-from .const import DOMAIN, CONF_PROVIDER
+from .const import DOMAIN, CONF_PROVIDER, CONF_TV_ENTITY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,7 +23,10 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the TV Channel Mapping sensor."""
-    async_add_entities([TVChannelMappingSensor(hass, entry)])
+    entities: list[SensorEntity] = [TVChannelMappingSensor(hass, entry)]
+    if entry.data.get(CONF_TV_ENTITY):
+        entities.append(TVCurrentChannelSensor(hass, entry))
+    async_add_entities(entities)
 
 
 class TVChannelMappingSensor(SensorEntity):
@@ -44,37 +49,105 @@ class TVChannelMappingSensor(SensorEntity):
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes (The Mapping)."""
         domain_data = self._hass.data[DOMAIN][self._entry.entry_id]
-        base_channels = domain_data["base_channels"]
-        
-        overrides = self._entry.options.get("overrides", {})
-        custom_channels = self._entry.options.get("custom_channels", [])
-        deleted_channels = self._entry.options.get("deleted_channels", [])
-        
-        mapping = {}
-        
-        # Process base channels
-        for ch in base_channels:
-            c_id = ch["id"]
-            if c_id in deleted_channels:
-                continue
-            
-            # Get overridden name or default name
-            c_name = overrides.get(c_id, ch["name"])
-            c_number = ch["number"]
-            
-            mapping[c_name] = c_number
-
-        # Process custom channels
-        for ch in custom_channels:
-            c_id = ch["id"]
-            # Custom channels can also be overridden (renamed) or deleted (though usually deleted means removed from list)
-            # But let's check overrides just in case user renamed a custom channel
-            c_name = overrides.get(c_id, ch["name"])
-            c_number = ch["number"]
-            
-            mapping[c_name] = c_number
-            
-        return {"channels": mapping, "provider": self.state}
+        index = domain_data["index"]
+
+        # Active channels (provider + custom, renamed, without deleted ones);
+        # a custom channel replaces a catalog channel of the same name
+        mapping = {
+            ch["name"]: ch["number"] for ch in index.channels if ch["id"] not in index.shadowed
+        }
+
+        attributes = {"channels": mapping, "provider": self.state}
+        if domain_data["profiles"]:
+            attributes["profiles"] = {
+                name: [
+                    ch["name"]
+                    for ch in index.visible_channels(profile.mask)
+                    if ch["id"] not in index.shadowed
+                ]
+                for name, profile in domain_data["profiles"].items()
+            }
+        return attributes
+
+    @property
+    def should_poll(self) -> bool:
+        """No polling needed."""
+        return False
+
+
+class TVCurrentChannelSensor(SensorEntity):
+    """Channel currently shown on the configured TV.
+
+    Follows state changes of the TV entity and resolves the reported channel
+    through the entry's precomputed index. The state is only written when the
+    resolved channel actually changes, not on every TV attribute update.
+    """
+
+    _TV_OFF_STATES = (STATE_OFF, STATE_UNAVAILABLE, STATE_UNKNOWN)
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        self._hass = hass
+        self._entry = entry
+        self._tv_entity = entry.data[CONF_TV_ENTITY]
+        self._channel: dict[str, Any] | None = None
+        self._attr_name = "TV Current Channel"
+        self._attr_unique_id = f"{entry.entry_id}_current_channel"
+        self._attr_icon = "mdi:television-play"
+
+    async def async_added_to_hass(self) -> None:
+        """Resolve the current channel and subscribe to TV state changes."""
+        self._channel = self._resolve_channel(self._hass.states.get(self._tv_entity))
+        self.async_on_remove(
+            async_track_state_change_event(
+                self._hass, [self._tv_entity], self._async_tv_state_changed
+            )
+        )
+
+    @callback
+    def _async_tv_state_changed(self, event: Event) -> None:
+        """Handle a state change of the TV entity."""
+        channel = self._resolve_channel(event.data.get("new_state"))
+        old_id = self._channel["id"] if self._channel else None
+        new_id = channel["id"] if channel else None
+        if old_id == new_id:
+            return
+
+        self._channel = channel
+        self.async_write_ha_state()
+
+    def _resolve_channel(self, tv_state: State | None) -> dict[str, Any] | None:
+        """Map the TV state back to a channel of the active lineup."""
+        if tv_state is None or tv_state.state in self._TV_OFF_STATES:
+            return None
+
+        domain_data = self._hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if not domain_data:
+            return None
+        index = domain_data["index"]
+
+        # Most TVs report the tuned number as media_content_id, some report
+        # the channel name there or in the source attribute instead.
+        content_id = tv_state.attributes.get("media_content_id")
+        source = tv_state.attributes.get("source")
+        return (
+            index.channel_for_number(content_id)
+            or index.channel_for_name(content_id)
+            or index.channel_for_name(source)
+            or index.channel_for_number(source)
+        )
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the name of the current channel."""
+        return self._channel["name"] if self._channel else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the number and ID of the current channel."""
+        if not self._channel:
+            return {"number": None, "channel_id": None}
+        return {"number": self._channel["number"], "channel_id": self._channel["id"]}
 
     @property
     def should_poll(self) -> bool:
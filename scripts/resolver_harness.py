@@ -0,0 +1,563 @@
+"""Resolver equivalence and load harness for TV Channel Mapping.
+
+Replays an utterance corpus through the original (pre-index) channel
+resolution and the current ChannelIndex based one, reports every result
+difference together with latency percentiles, and optionally drives many
+concurrent tune_channel service calls and TvChannelSwitch intents against a
+stub hass whose media_player.play_media only records the calls.
+
+The corpus is generated from the provider catalogs (English and Hungarian
+forms, suffixes such as "-re"/"-ra", misspellings) and can be extended with
+recorded utterances, one per line.
+
+Usage (from the repository root):
+
+    python scripts/resolver_harness.py
+    python scripts/resolver_harness.py --provider "HU One" --corpus recorded.txt
+    python scripts/resolver_harness.py --load 5000 --concurrency 200
+
+The equivalence check only needs the standard library. The load test imports
+the integration itself and therefore needs homeassistant installed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import difflib
+import os
+import random
+import statistics
+import sys
+import time
+import types
+from typing import Any, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "custom_components.tv_channel_mapping"
+
+try:
+    import homeassistant  # noqa: F401
+    HAS_HA = True
+except ImportError:
+    HAS_HA = False
+
+sys.path.insert(0, ROOT)
+if not HAS_HA:
+    # Without homeassistant only the pure modules can be imported, so skip
+    # the package __init__ (which sets up the integration) altogether.
+    for name, path in (
+        ("custom_components", os.path.join(ROOT, "custom_components")),
+        (PACKAGE, os.path.join(ROOT, "custom_components", "tv_channel_mapping")),
+    ):
+        module = types.ModuleType(name)
+        module.__path__ = [path]
+        sys.modules[name] = module
+
+from custom_components.tv_channel_mapping.catalog import (  # noqa: E402
+    load_json_data,
+    provider_data_path,
+)
+from custom_components.tv_channel_mapping.channel_index import (  # noqa: E402
+    build_channel_index,
+)
+from custom_components.tv_channel_mapping.const import (  # noqa: E402
+    DEFAULT_FAST_PATH_THRESHOLD,
+    PROVIDERS,
+)
+from custom_components.tv_channel_mapping.fast_path import (  # noqa: E402
+    confident_channel,
+    load_sentence_patterns,
+    match_channel_slot,
+)
+
+
+# ---------------------------------------------------------------------------
+# Reference resolvers: the channel matching as it was before the index.
+# Keep these verbatim; they are the baseline new resolvers are checked against.
+# ---------------------------------------------------------------------------
+
+def reference_tune_number(base_channels: list[dict], options: dict, channel_name_input: str) -> Any:
+    """Channel number picked by the original _async_tune_channel_logic."""
+    custom_channels_list = options.get("custom_channels", [])
+    deleted_channels = options.get("deleted_channels", [])
+    overrides = options.get("overrides", {})
+
+    all_channels_map = {ch["id"]: ch for ch in base_channels}
+    for ch in custom_channels_list:
+        all_channels_map[ch["id"]] = ch
+
+    active_channels_map = {
+        c_id: ch_data for c_id, ch_data in all_channels_map.items()
+        if c_id not in deleted_channels
+    }
+
+    target_number = None
+    target_name_match = channel_name_input.lower().strip()
+
+    for c_id, ch_data in active_channels_map.items():
+        name = overrides.get(c_id, ch_data["name"]).lower()
+        if name == target_name_match:
+            target_number = ch_data["number"]
+            break
+
+    if not target_number:
+        for c_id, ch_data in active_channels_map.items():
+            name = overrides.get(c_id, ch_data["name"]).lower()
+            if target_name_match in name.split():
+                target_number = ch_data["number"]
+                break
+            if name.startswith(target_name_match):
+                target_number = ch_data["number"]
+                break
+
+    if not target_number:
+        name_to_number = {}
+        for c_id, ch_data in active_channels_map.items():
+            name = overrides.get(c_id, ch_data["name"]).lower()
+            name_to_number[name] = ch_data["number"]
+
+        matches = difflib.get_close_matches(target_name_match, name_to_number.keys(), n=1, cutoff=0.6)
+        if matches:
+            target_number = name_to_number[matches[0]]
+
+    return target_number
+
+
+def reference_clean_channel_name(channel_name_raw: str) -> str:
+    """Suffix cleaning of the original SwitchChannelIntent."""
+    channel_name_clean = channel_name_raw
+    if channel_name_raw.endswith("-re"):
+        channel_name_clean = channel_name_raw[:-3]
+    elif channel_name_raw.endswith("-ra"):
+        channel_name_clean = channel_name_raw[:-3]
+    elif channel_name_raw.endswith("re") and len(channel_name_raw) > 2:
+        channel_name_clean = channel_name_raw[:-2]
+    elif channel_name_raw.endswith("ra") and len(channel_name_raw) > 2:
+        channel_name_clean = channel_name_raw[:-2]
+    return channel_name_clean
+
+
+def reference_intent_number(base_channels: list[dict], options: dict, slot_value: str) -> Any:
+    """Channel number picked by the original SwitchChannelIntent (exact only)."""
+    channel_name_raw = slot_value.lower()
+    channel_name_clean = reference_clean_channel_name(channel_name_raw)
+    overrides = options.get("overrides", {})
+    custom_channels = options.get("custom_channels", [])
+    deleted_channels = options.get("deleted_channels", [])
+
+    def check_match(name_to_check):
+        name_norm = name_to_check.lower()
+        return name_norm in (channel_name_raw, channel_name_clean)
+
+    for ch in base_channels:
+        if ch["id"] in deleted_channels:
+            continue
+        if check_match(overrides.get(ch["id"], ch["name"])):
+            return ch["number"]
+    for ch in custom_channels:
+        if check_match(overrides.get(ch["id"], ch["name"])):
+            return ch["number"]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Current resolvers
+# ---------------------------------------------------------------------------
+
+def _current_clean() -> Callable[[str], str]:
+    """Return the suffix cleaning of the current intent handler."""
+    if HAS_HA:
+        from custom_components.tv_channel_mapping.intent import clean_channel_name
+        return clean_channel_name
+    print("homeassistant not installed: using the reference suffix cleaning for the intent path")
+    return reference_clean_channel_name
+
+
+def current_tune_number(index, name: str) -> Any:
+    """Channel number picked by the index based resolver."""
+    resolution = index.resolve(name)
+    return resolution.channel["number"] if resolution.channel else None
+
+
+def current_intent_number(index, clean: Callable[[str], str], slot_value: str) -> Any:
+    """Channel number picked by the index based intent handler."""
+    raw = slot_value.lower()
+    channel = index.channel_for_name(raw) or index.channel_for_name(clean(raw))
+    return channel["number"] if channel else None
+
+
+# ---------------------------------------------------------------------------
+# Corpus and scenarios
+# ---------------------------------------------------------------------------
+
+NOISE = [
+    "weather", "lights", "kitchen", "időjárás", "lámpa", "music", "zene",
+    "news", "híradó", "sport", "film", "mese", "the", "tv",
+]
+
+
+def _misspell(rng: random.Random, word: str) -> str:
+    """Return a speech-to-text like corruption of a word."""
+    if len(word) < 3:
+        return word + word[-1]
+    pos = rng.randrange(len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:pos] + word[pos + 1:]
+    if kind == 1:
+        return word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    return word[:pos] + word[pos] + word[pos:]
+
+
+def generate_corpus(channels: list[dict], seed: int, misspellings: int) -> list[str]:
+    """Generate English and Hungarian style utterances from a catalog."""
+    rng = random.Random(seed)
+    corpus = []
+    for ch in channels:
+        name = ch["name"]
+        first = name.split()[0]
+        short = name[:-3] if name.endswith(" HD") else name
+        corpus.extend([name, name.lower(), name.upper(), first, short, f" {short} "])
+        # Hungarian suffixes: "RTL-re", "HBO-ra", "RTLre" when STT drops the hyphen
+        corpus.extend([f"{first}-re", f"{first}-ra", f"{first}re", f"{short}-re"])
+        for _ in range(misspellings):
+            corpus.append(_misspell(rng, short))
+    corpus.extend(NOISE)
+    return corpus
+
+
+def load_corpus(path: str) -> list[str]:
+    """Load recorded utterances, one per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def build_scenarios(channels: list[dict]) -> dict[str, dict]:
+    """Return option sets to check: untouched and heavily customized."""
+    overrides = {
+        ch["id"]: f"{ch['name']} Plus" for ch in channels[::7]
+    }
+    # Renames that collide with, or shorten to, other channel names
+    overrides[channels[1]["id"]] = channels[2]["name"]
+    overrides[channels[3]["id"]] = channels[3]["name"].split()[0]
+    return {
+        "plain": {},
+        "customized": {
+            "overrides": overrides,
+            "deleted_channels": [ch["id"] for ch in channels[5::11]],
+            "custom_channels": [
+                {"id": "custom-0001", "name": "Nappali Kamera", "number": 901},
+                {"id": "custom-0002", "name": channels[0]["name"], "number": 902},
+                {"id": "custom-0003", "name": "Replaced Channel", "number": channels[4]["number"]},
+            ],
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Equivalence
+# ---------------------------------------------------------------------------
+
+def _percentiles(samples_ns: list[int]) -> str:
+    """Format p50/p90/p99/max of latency samples in microseconds."""
+    if not samples_ns:
+        return "n/a"
+    samples = sorted(samples_ns)
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+
+    def fmt(ns: float) -> str:
+        return f"{ns / 1000:.1f}"
+
+    return (
+        f"p50={fmt(quantiles[49])}us p90={fmt(quantiles[89])}us "
+        f"p99={fmt(quantiles[98])}us max={fmt(samples[-1])}us"
+    )
+
+
+def _timed(func: Callable[[], Any], samples: list[int]) -> Any:
+    start = time.perf_counter_ns()
+    result = func()
+    samples.append(time.perf_counter_ns() - start)
+    return result
+
+
+def check_equivalence(
+    base_channels: list[dict],
+    options: dict,
+    corpus: list[str],
+    clean: Callable[[str], str],
+    show: int,
+) -> int:
+    """Compare reference and current resolvers; return the number of differences."""
+
+    start = time.perf_counter_ns()
+    index = build_channel_index(base_channels, options)
+    build_us = (time.perf_counter_ns() - start) / 1000
+
+    differences = []
+    timings: dict[str, list[int]] = {key: [] for key in ("ref_tune", "new_tune", "ref_intent", "new_intent")}
+
+    for utterance in corpus:
+        if not utterance.strip():
+            continue
+        ref = _timed(lambda: reference_tune_number(base_channels, options, utterance), timings["ref_tune"])
+        new = _timed(lambda: current_tune_number(index, utterance), timings["new_tune"])
+        if ref != new:
+            differences.append(("tune_channel", utterance, ref, new))
+
+        # Assist trims wildcard slot values before they reach the intent handler
+        slot_value = utterance.strip()
+        ref = _timed(lambda: reference_intent_number(base_channels, options, slot_value), timings["ref_intent"])
+        new = _timed(lambda: current_intent_number(index, clean, slot_value), timings["new_intent"])
+        if ref != new:
+            differences.append(("intent", utterance, ref, new))
+
+    print(f"  utterances: {len(corpus)}, index build: {build_us:.0f}us")
+    for key, samples in timings.items():
+        print(f"  {key:<11} {_percentiles(samples)}")
+    print(f"  differences: {len(differences)}")
+    for path, utterance, ref, new in differences[:show]:
+        print(f"    [{path}] {utterance!r}: reference={ref} current={new}")
+    return len(differences)
+
+
+# ---------------------------------------------------------------------------
+# Fast path regression cases
+# ---------------------------------------------------------------------------
+
+# Utterance -> channel the fast path may tune locally (None: leave it to the
+# fallback agent). Generic words must never be grabbed by a channel that
+# merely contains them, e.g. "tv" in "M2 HD/Petőfi TV HD".
+FAST_PATH_CASES = [
+    ("Turn on TV", None),
+    ("Turn on the TV", None),
+    ("Turn on sport", None),
+    ("Put on news", None),
+    ("Turn on the lights", None),
+    ("Put on Dunaa", None),
+    ("Put on RTL", "RTL HD"),
+    ("Switch the living room TV to Duna", "Duna HD"),
+    ("Válts az RTL-re", "RTL HD"),
+    ("Kapcsold a tévét az M4 Sport csatornára", "M4 Sport HD"),
+]
+
+
+def check_fast_path(base_channels: list[dict], clean: Callable[[str], str]) -> int:
+    """Run the fast path regression cases; return the number of failures."""
+    patterns = load_sentence_patterns()
+    index = build_channel_index(base_channels, {})
+    failures = 0
+    for utterance, expected in FAST_PATH_CASES:
+        slot = match_channel_slot(patterns, utterance, None)
+        match = (
+            confident_channel(index, slot, DEFAULT_FAST_PATH_THRESHOLD, clean)
+            if slot is not None
+            else None
+        )
+        got = match[1]["name"] if match else None
+        if got != expected:
+            failures += 1
+            print(f"    [fast path] {utterance!r}: expected={expected} got={got}")
+    print(f"  fast path cases: {len(FAST_PATH_CASES)}, failures: {failures}")
+    return failures
+
+
+# ---------------------------------------------------------------------------
+# Load test against a stub hass
+# ---------------------------------------------------------------------------
+
+# play_media calls made by the current harness call; every gathered call runs
+# in its own task and so sees its own list, however the calls interleave
+_call_tunes: contextvars.ContextVar[list[Any]] = contextvars.ContextVar("call_tunes")
+
+
+class _StubServices:
+    """Service registry that records media_player.play_media calls."""
+
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def async_call(self, domain: str, service: str, data: dict, **kwargs) -> None:
+        if (domain, service) != ("media_player", "play_media"):
+            raise ValueError(f"Unexpected service call {domain}.{service}")
+        self.calls.append(data)
+        if (tunes := _call_tunes.get(None)) is not None:
+            tunes.append(data["media_content_id"])
+        # Yield like a real service call would
+        await asyncio.sleep(0)
+
+
+class _StubConfigEntries:
+    """Config entry registry holding the harness entry."""
+
+    def __init__(self, entry) -> None:
+        self._entry = entry
+
+    def async_get_entry(self, entry_id: str):
+        return self._entry if entry_id == self._entry.entry_id else None
+
+    def async_entries(self, domain: str | None = None):
+        return [self._entry]
+
+
+class _StubMissLog:
+    """Miss log without persistence."""
+
+    def __init__(self) -> None:
+        self.records = 0
+
+    def record(self, utterance: str, channel_id: str | None, stage: str | None) -> None:
+        self.records += 1
+
+
+async def run_load(
+    provider: str,
+    base_channels: list[dict],
+    options: dict,
+    corpus: list[str],
+    total: int,
+    concurrency: int,
+) -> int:
+    """Drive concurrent service calls and intents; return the number of wrong tunes."""
+    from homeassistant.helpers import intent
+
+    from custom_components.tv_channel_mapping import _async_tune_channel_logic
+    from custom_components.tv_channel_mapping.const import DOMAIN
+    from custom_components.tv_channel_mapping.intent import SwitchChannelIntent
+
+    tv_entity = "media_player.harness_tv"
+    entry = types.SimpleNamespace(
+        entry_id="harness",
+        title=provider,
+        data={"provider": provider, "tv_entity": tv_entity},
+        options=options,
+    )
+    services = _StubServices()
+    hass = types.SimpleNamespace(
+        data={},
+        services=services,
+        config_entries=_StubConfigEntries(entry),
+    )
+    index = build_channel_index(base_channels, options)
+    hass.data[DOMAIN] = {
+        entry.entry_id: {
+            "provider": provider,
+            "sources": [provider],
+            "conflicts": [],
+            "base_channels": base_channels,
+            "index": index,
+            "profiles": {},
+            "miss_log": _StubMissLog(),
+        }
+    }
+
+    handler = SwitchChannelIntent()
+    rng = random.Random(0)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: dict[str, list[int]] = {"service": [], "intent": []}
+    wrong: list[tuple[str, str, Any, Any]] = []
+    failures = {"service": 0, "intent": 0}
+
+    async def one_call(utterance: str, use_intent: bool) -> None:
+        path = "intent" if use_intent else "service"
+        if use_intent:
+            utterance = utterance.strip()
+        expected = (
+            reference_intent_number(base_channels, options, utterance)
+            if use_intent
+            else reference_tune_number(base_channels, options, utterance)
+        )
+        tunes: list[Any] = []
+        _call_tunes.set(tunes)
+        async with semaphore:
+            start = time.perf_counter_ns()
+            try:
+                if use_intent:
+                    intent_obj = types.SimpleNamespace(
+                        hass=hass,
+                        slots={"channel_name": {"value": utterance}},
+                        context=types.SimpleNamespace(user_id=None),
+                        device_id=None,
+                        language="en",
+                        create_response=lambda: intent.IntentResponse(language="en"),
+                    )
+                    await handler.async_handle(intent_obj)
+                else:
+                    await _async_tune_channel_logic(hass, entry, utterance)
+                tuned = True
+            except (ValueError, intent.IntentHandleError):
+                failures[path] += 1
+                tuned = False
+            latencies[path].append(time.perf_counter_ns() - start)
+
+        # Calls interleave, so compare the number this call tuned, not the last one
+        if not tuned:
+            if expected is not None:
+                wrong.append((path, utterance, expected, None))
+        elif len(tunes) != 1:
+            wrong.append((path, utterance, expected, f"{len(tunes)} play_media calls"))
+        elif tunes[0] != expected:
+            wrong.append((path, utterance, expected, tunes[0]))
+
+    calls = [one_call(rng.choice(corpus), bool(i % 2)) for i in range(total)]
+    start = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+
+    tuned_numbers: dict[Any, int] = {}
+    for call in services.calls:
+        tuned_numbers[call["media_content_id"]] = tuned_numbers.get(call["media_content_id"], 0) + 1
+
+    print(f"  {total} calls, concurrency {concurrency}: {elapsed:.2f}s ({total / elapsed:.0f} calls/s)")
+    print(f"  play_media calls: {len(services.calls)}, distinct channels: {len(tuned_numbers)}")
+    for path, samples in latencies.items():
+        print(f"  {path:<8} not found: {failures[path]:<6} {_percentiles(samples)}")
+    print(f"  outcome mismatches vs reference: {len(wrong)}")
+    for path, utterance, expected, got in wrong[:10]:
+        print(f"    [{path}] {utterance!r}: reference={expected} current={got}")
+    return len(wrong)
+
+
+# ---------------------------------------------------------------------------
+
+def main() -> int:
+    """Run the harness."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--provider", action="append", choices=PROVIDERS, help="Catalog(s) to use (default: all bundled)")
+    parser.add_argument("--corpus", action="append", default=[], help="File with recorded utterances, one per line")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generated misspellings")
+    parser.add_argument("--misspellings", type=int, default=3, help="Misspelled variants per channel")
+    parser.add_argument("--show", type=int, default=20, help="Differences to print per scenario")
+    parser.add_argument("--load", type=int, default=0, help="Number of concurrent calls to drive (needs homeassistant)")
+    parser.add_argument("--concurrency", type=int, default=100, help="Maximum calls in flight during --load")
+    args = parser.parse_args()
+
+    if args.load and not HAS_HA:
+        parser.error("--load needs homeassistant installed")
+
+    clean = _current_clean()
+    recorded = [utterance for path in args.corpus for utterance in load_corpus(path)]
+    differences = 0
+
+    for provider in args.provider or PROVIDERS:
+        base_channels = load_json_data(provider_data_path(provider))["channels"]
+        corpus = generate_corpus(base_channels, args.seed, args.misspellings) + recorded
+
+        print(f"{provider} / fast path")
+        differences += check_fast_path(base_channels, clean)
+
+        for scenario, options in build_scenarios(base_channels).items():
+            print(f"{provider} / {scenario}")
+            differences += check_equivalence(base_channels, options, corpus, clean, args.show)
+            if args.load:
+                differences += asyncio.run(
+                    run_load(provider, base_channels, options, corpus, args.load, args.concurrency)
+                )
+
+    print("OK: no differences" if not differences else f"FAILED: {differences} differences")
+    return 1 if differences else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())